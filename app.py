@@ -4,18 +4,95 @@ Recruitin Labour Market Intelligence API
 Flask wrapper for processing Jotform submissions
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, abort, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+from tempfile import SpooledTemporaryFile
+import json
 import os
 import logging
+from transport import record_jotform_submission
+from pipeline import PipelineFull, get_pipeline
+from profiling import PROFILE_DEEPDIVE, profile_header_allowed
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Request size limits (bytes), sized for a small Render instance
+MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+MAX_FORM_MEMORY_SIZE = int(os.environ.get('MAX_FORM_MEMORY_SIZE', 2 * 1024 * 1024))
+MAX_FORM_PARTS = int(os.environ.get('MAX_FORM_PARTS', 200))
+FORM_SPOOL_SIZE = int(os.environ.get('FORM_SPOOL_SIZE', 256 * 1024))
+
+class BoundedRequest(Request):
+    """Caps in-memory form fields and spools large file parts to disk"""
+    max_form_memory_size = MAX_FORM_MEMORY_SIZE
+    max_form_parts = MAX_FORM_PARTS
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=FORM_SPOOL_SIZE, mode='rb+')
+
 app = Flask(__name__)
+app.request_class = BoundedRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
 CORS(app)
 
+PIPELINE_ENABLED = os.environ.get('PIPELINE_ENABLED', 'False').lower() == 'true'
+
+# Jotform question names feeding the report pipeline
+# Update these based on your actual Jotform question names
+PIPELINE_FIELDS = {
+    'job_title': 'jobTitle',
+    'location': 'location',
+    'jobdigger_pdf_url': 'jobdiggerPdf',
+    'report_type': 'reportType',
+    'email': 'email',
+}
+
+# Only these answers are kept from a submission
+JOTFORM_FIELDS = frozenset(PIPELINE_FIELDS.values())
+
+def _drop_unmapped_answer(pairs):
+    """
+    json.loads hook: replace answers we do not map by their name only, so
+    large free-text and unused fields are released while parsing
+    """
+    obj = dict(pairs)
+    if 'name' in obj and ('answer' in obj or 'text' in obj) and obj['name'] not in JOTFORM_FIELDS:
+        return {'name': obj['name']}
+    return obj
+
+def extract_submission(raw_request):
+    """Parse a rawRequest payload into submission metadata plus mapped answers"""
+    submission = json.loads(raw_request, object_pairs_hook=_drop_unmapped_answer)
+    extracted_data = {
+        'submission_id': submission.get('submissionID'),
+        'submission_date': submission.get('created_at'),
+        'form_id': submission.get('formID'),
+    }
+    for q_data in submission.get('answers', {}).values():
+        question_name = q_data.get('name')
+        if question_name in JOTFORM_FIELDS:
+            extracted_data[question_name] = q_data.get('answer', q_data.get('text', ''))
+    return extracted_data
+
+def build_pipeline_job(extracted_data):
+    """
+    Map extracted Jotform answers onto a pipeline job
+    Answers that are not text (e.g. widget answers as a dict) count as missing
+    """
+    job = {'job_id': extracted_data.get('submission_id')}
+    for key, question_name in PIPELINE_FIELDS.items():
+        value = extracted_data.get(question_name)
+        # File upload answers arrive as a list of URLs
+        if isinstance(value, list):
+            value = value[0] if value else None
+        job[key] = value if isinstance(value, str) and value else None
+    if job['report_type']:
+        job['report_type'] = job['report_type'].lower().replace(' ', '_')
+    return job
+
 @app.route('/', methods=['GET'])
 def home():
     """API home/docs endpoint"""
@@ -25,7 +102,10 @@ def home():
         'status': 'operational',
         'endpoints': {
             '/health': 'Health check',
-            '/webhook/jotform': 'Jotform webhook handler (POST)'
+            '/webhook/jotform': 'Jotform webhook handler (POST)',
+            '/pipeline/stats': 'Pipeline throughput per stage',
+            '/pipeline/jobs/<job_id>': 'Pipeline job status',
+            '/reports/<job_id>': 'Report Markdown (ETag / If-None-Match)'
         },
         'documentation': 'https://github.com/recruitin/labour-market-intelligence'
     })
@@ -48,49 +128,64 @@ def jotform_webhook():
     try:
         logger.info("Received Jotform webhook")
         
-        # Get form data
-        form_data = request.form.to_dict()
-        logger.info(f"Form data keys: {list(form_data.keys())}")
+        # Werkzeug only applies the form limits to multipart bodies and reads
+        # urlencoded ones into memory whole, so cap those up front
+        if request.mimetype != 'multipart/form-data' and (request.content_length or 0) > MAX_FORM_MEMORY_SIZE:
+            abort(413)
+        
+        # Only the rawRequest field is read; other parts stay spooled
+        raw_request = request.form.get('rawRequest')
+        logger.info(f"Form data keys: {list(request.form.keys())}")
         
         # Parse rawRequest if present
-        raw_request = form_data.get('rawRequest')
         if raw_request:
-            import json
             try:
-                submission = json.loads(raw_request)
-                logger.info(f"Parsed submission ID: {submission.get('submissionID')}")
+                extracted_data = extract_submission(raw_request)
+                logger.info(f"Parsed submission ID: {extracted_data.get('submission_id')}")
+                record_jotform_submission(extracted_data.get('submission_id'), raw_request)
                 
-                # Extract answers
-                answers = submission.get('answers', {})
+                logger.info(f"Extracted fields: {sorted(extracted_data)}")
                 
-                # Map question IDs to data
-                # Update these based on your actual Jotform question IDs
-                extracted_data = {
-                    'submission_id': submission.get('submissionID'),
-                    'submission_date': submission.get('created_at'),
-                    'form_id': submission.get('formID'),
-                }
-                
-                # Extract all answers dynamically
-                for q_id, q_data in answers.items():
-                    answer = q_data.get('answer', q_data.get('text', ''))
-                    question_name = q_data.get('name', f'question_{q_id}')
-                    extracted_data[question_name] = answer
+                # Opt-in cProfile + regex timings, saved per job ID; the
+                # header has to carry PROFILE_TOKEN
+                profile_header = request.headers.get('X-Profile', '')
+                profile = PROFILE_DEEPDIVE or profile_header_allowed(profile_header)
+                if profile_header and not profile:
+                    logger.warning("Ignoring X-Profile header without a valid PROFILE_TOKEN")
                 
-                logger.info(f"Extracted data: {extracted_data}")
+                # Process the submission: download PDFs -> parse -> analysis
+                # -> report (TODO: send email)
+                queued = False
+                if PIPELINE_ENABLED:
+                    job = build_pipeline_job(extracted_data)
+                    job['profile'] = profile
+                    if job['job_id'] and job['job_title'] and job['location']:
+                        try:
+                            get_pipeline().submit(job)
+                        except PipelineFull as e:
+                            logger.warning(f"Pipeline full, rejecting submission {job['job_id']}: {e}")
+                            response = jsonify({
+                                'success': False,
+                                'submission_id': job['job_id'],
+                                'error': 'Pipeline is busy, retry later'
+                            })
+                            response.headers['Retry-After'] = '30'
+                            return response, 503
+                        queued = True
+                        logger.info(f"Queued submission {job['job_id']} for processing")
                 
-                # TODO: Process the submission
-                # - Download PDFs
-                # - Run analysis
-                # - Generate report
-                # - Send email
-                
-                return jsonify({
+                result = {
                     'success': True,
                     'submission_id': extracted_data.get('submission_id'),
                     'message': 'Submission received successfully',
                     'data_received': extracted_data
-                }), 200
+                }
+                if profile and not queued:
+                    # Profiles are only written by the pipeline stages
+                    reason = 'PIPELINE_ENABLED is off' if not PIPELINE_ENABLED else 'submission was not queued'
+                    logger.warning(f"Profiling requested for {extracted_data.get('submission_id')} but not run: {reason}")
+                    result['profiling'] = f'Not run: {reason}'
+                return jsonify(result), 200
                 
             except json.JSONDecodeError as e:
                 logger.error(f"JSON decode error: {e}")
@@ -99,14 +194,17 @@ def jotform_webhook():
                     'error': 'Invalid JSON in rawRequest'
                 }), 400
         else:
-            # No rawRequest, just echo form data
-            logger.warning("No rawRequest found, returning form data")
+            # No rawRequest, just echo the field names
+            logger.warning("No rawRequest found, returning form field names")
             return jsonify({
                 'success': True,
                 'message': 'Webhook received (no rawRequest)',
-                'form_data': form_data
+                'form_fields': list(request.form.keys())
             }), 200
         
+    except HTTPException:
+        # e.g. 413 from the request size limits
+        raise
     except Exception as e:
         logger.error(f"Webhook error: {e}", exc_info=True)
         return jsonify({
@@ -114,6 +212,37 @@ def jotform_webhook():
             'error': str(e)
         }), 500
 
+@app.route('/pipeline/stats', methods=['GET'])
+def pipeline_stats():
+    """Queue depth and throughput per pipeline stage"""
+    if not PIPELINE_ENABLED:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **get_pipeline().stats()})
+
+@app.route('/pipeline/jobs/<job_id>', methods=['GET'])
+def pipeline_job(job_id):
+    """Status (and report, once completed) of a pipeline job"""
+    status = get_pipeline().status(job_id) if PIPELINE_ENABLED else None
+    if status is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job_id': job_id, **status})
+
+@app.route('/reports/<job_id>', methods=['GET'])
+def report_markdown(job_id):
+    """
+    Finished report as Markdown
+    Supports conditional GET, so pollers get a 304 while the report is unchanged
+    """
+    status = get_pipeline().status(job_id) if PIPELINE_ENABLED else None
+    if status is None or status.get('status') != 'completed':
+        return jsonify({'error': 'Report not found'}), 404
+    
+    report = status['report']
+    response = Response(report['markdown'], mimetype='text/markdown')
+    response.set_etag(report['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @app.errorhandler(404)
 def not_found(e):
     return jsonify({
@@ -121,10 +250,22 @@ def not_found(e):
         'available_endpoints': {
             '/': 'API home',
             '/health': 'Health check',
-            '/webhook/jotform': 'Jotform webhook (POST)'
+            '/webhook/jotform': 'Jotform webhook (POST)',
+            '/pipeline/stats': 'Pipeline stats',
+            '/pipeline/jobs/<job_id>': 'Pipeline job status',
+            '/reports/<job_id>': 'Report Markdown'
         }
     }), 404
 
+@app.errorhandler(413)
+def too_large(e):
+    return jsonify({
+        'success': False,
+        'error': 'Request too large',
+        'max_content_length': MAX_CONTENT_LENGTH,
+        'max_form_memory_size': MAX_FORM_MEMORY_SIZE
+    }), 413
+
 @app.errorhandler(500)
 def internal_error(e):
     return jsonify({
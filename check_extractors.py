@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Extractor runtime check
+Checks the run_extractors guards (truncation, failures, time budgets), then
+runs every Jobdigger extractor on adversarial input of 1 MB and 10 MB and
+fails when runtime grows superlinearly (e.g. regex backtracking)
+"""
+
+import random
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+from pipeline import load_mcp
+
+mcp = load_mcp()
+
+# === GUARDED MODE ===
+@contextmanager
+def _patched(**attrs: Any) -> Iterator[None]:
+    """Temporarily override MCP module settings (budgets, EXTRACTORS)"""
+    saved = {name: getattr(mcp, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(mcp, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(mcp, name, value)
+
+def _fail(text: str) -> Any:
+    raise ValueError('extractor bug')
+
+def _slow(text: str) -> int:
+    time.sleep(0.05)
+    return len(text)
+
+def check_guarded_mode() -> bool:
+    """
+    Run run_extractors with stub extractors and tiny limits, checking each
+    guard sets its value, its extraction list and the partial flag
+    """
+    ok = True
+
+    def expect(case: str, condition: bool) -> None:
+        nonlocal ok
+        if not condition:
+            ok = False
+            print(f"❌ guarded mode: {case}")
+
+    results, extraction = mcp.run_extractors("Junior € 40.000 Senior € 60.000")
+    expect('complete text is not partial', not extraction['partial'] and
+           set(results) == set(mcp.EXTRACTORS))
+
+    with _patched(MAX_EXTRACT_CHARS=10, EXTRACTORS={'length': (len, lambda: 0)}):
+        results, extraction = mcp.run_extractors('x' * 100)
+        expect('long text is truncated', results['length'] == 10 and
+               extraction['truncated'] and extraction['partial'])
+        results, extraction = mcp.run_extractors('x' * 100, guarded=False)
+        expect('unguarded text is not truncated', results['length'] == 100 and
+               not extraction['partial'])
+
+    with _patched(EXTRACTORS={'broken': (_fail, list), 'length': (len, lambda: 0)}):
+        results, extraction = mcp.run_extractors('abc')
+        expect('failing extractor gets its empty value', results == {'broken': [], 'length': 3} and
+               extraction['failed'] == ['broken'] and extraction['partial'])
+        try:
+            mcp.run_extractors('abc', guarded=False)
+            expect('unguarded failure raises', False)
+        except ValueError:
+            pass
+
+    with _patched(EXTRACTOR_BUDGET_SECONDS=0.01, EXTRACTORS={'slow': (_slow, lambda: 0)}):
+        results, extraction = mcp.run_extractors('abc')
+        expect('slow extractor keeps its value', results['slow'] == 3 and
+               extraction['over_budget'] == ['slow'] and extraction['partial'])
+
+    with _patched(EXTRACTION_BUDGET_SECONDS=0.01,
+                  EXTRACTORS={'slow': (_slow, lambda: 0), 'length': (len, lambda: 0)}):
+        results, extraction = mcp.run_extractors('abc')
+        expect('extractors past the total budget are skipped', results['length'] == 0 and
+               extraction['skipped'] == ['length'] and extraction['partial'])
+
+    return ok
+
+# === ADVERSARIAL CORPORA ===
+FUZZ_TOKENS = [
+    'Junior', 'Medior', 'Senior', 'Gemiddeld:', 'Totaal:', 'gepubliceerde vacatures',
+    '€', '€ 40.000', '5.763', '1', '12', '52%', '%', 'x', 'VCA', 'MTS', 'HBO', 'WO',
+    'Nederlands', 'vast:', 'intermediair', 'dagen', 'www.', 'jobbird', '.nl', '.com',
+    'Monteur', 'Tata Steel', '&', '-', '/', '.', ' ', '  ', '\n'
+]
+
+def adversarial_corpora(size: int) -> Dict[str, str]:
+    """Inputs of `size` characters aimed at regex backtracking, plus random fuzz"""
+    def repeat(chunk: str) -> str:
+        return (chunk * (size // len(chunk) + 1))[:size]
+
+    rng = random.Random(size)
+    fuzz, length = [], 0
+    while length < size:
+        token = rng.choice(FUZZ_TOKENS)
+        fuzz.append(token)
+        length += len(token)
+
+    return {
+        'digits': repeat('1'),
+        'whitespace': repeat(' '),
+        'letters': repeat('a'),
+        'words_without_percent': repeat('Onderhoud '),
+        'junior_without_euro': repeat('Junior '),
+        'certificate_digits': repeat('VCA 123456789 '),
+        'ranked_list': repeat('1 5.763 x Monteur '),
+        'domain_without_tld': repeat('www.jobbird.'),
+        'fuzz': ''.join(fuzz)[:size]
+    }
+
+def check_extractor_scaling(
+    small: int = 1024 * 1024,
+    large: int = 10 * 1024 * 1024,
+    max_ratio: float = 25.0
+) -> bool:
+    """
+    Time every extractor on each corpus at two sizes
+
+    Linear extractors take about large/small (10x) longer on the large
+    input; quadratic ones take about 100x. Returns False if any
+    extractor/corpus pair exceeds max_ratio.
+    """
+    small_corpora, large_corpora = adversarial_corpora(small), adversarial_corpora(large)
+    ok = True
+    for corpus in small_corpora:
+        for field, (extractor, _) in mcp.EXTRACTORS.items():
+            started = time.perf_counter()
+            extractor(small_corpora[corpus])
+            small_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            extractor(large_corpora[corpus])
+            large_seconds = time.perf_counter() - started
+
+            # Floor tiny timings so timer noise does not look superlinear
+            ratio = large_seconds / max(small_seconds, 0.005)
+            if ratio > max_ratio:
+                ok = False
+                print(f"❌ {field} on {corpus}: {small_seconds:.3f}s -> {large_seconds:.3f}s ({ratio:.0f}x)")
+        print(f"   {corpus}: checked")
+    return ok
+
+if __name__ == "__main__":
+    print("Checking run_extractors guards...")
+    passed = check_guarded_mode()
+    print("Checking extractor runtime on adversarial input up to 10 MB...")
+    passed = check_extractor_scaling() and passed
+    print("✅ ALL EXTRACTORS LINEAR" if passed else "❌ SUPERLINEAR EXTRACTORS FOUND")
+    sys.exit(0 if passed else 1)
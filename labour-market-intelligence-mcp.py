@@ -4,36 +4,50 @@ Labour Market Intelligence MCP Server
 Integrates with Jotform, Notion, GitHub, and Recruitment Orchestra
 """
 
+import copy
+import hashlib
 import json
 import os
 import re
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 import PyPDF2
 from io import BytesIO
-import requests
+from transport import http_get
+from profiling import extractor_scope, record_regex, regex_timing_enabled
 
 # === CONFIGURATION ===
 JOTFORM_API_KEY = os.getenv("JOTFORM_API_KEY", "2189378edb821cfa9d6ddbb920038eea")
 BRAVE_SEARCH_API_KEY = os.getenv("BRAVE_SEARCH_API_KEY", "")
 NOTION_API_KEY = os.getenv("NOTION_API_KEY", "")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+BRAVE_SEARCH_URL = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
+DEEPDIVE_CACHE_TTL = int(os.getenv("DEEPDIVE_CACHE_TTL", "21600"))  # seconds
+DEEPDIVE_CACHE_SIZE = int(os.getenv("DEEPDIVE_CACHE_SIZE", "512"))  # nodes
+MAX_EXTRACT_CHARS = int(os.getenv("MAX_EXTRACT_CHARS", str(10 * 1024 * 1024)))
+EXTRACTOR_BUDGET_SECONDS = float(os.getenv("EXTRACTOR_BUDGET_SECONDS", "2"))
+EXTRACTION_BUDGET_SECONDS = float(os.getenv("EXTRACTION_BUDGET_SECONDS", "10"))
 
 # === MCP TOOL 1: PARSE JOBDIGGER REPORT ===
-def parse_jobdigger_pdf(pdf_url_or_path: str) -> Dict[str, Any]:
+def parse_jobdigger_pdf(pdf_url_or_path: str, guarded: bool = True) -> Dict[str, Any]:
     """
     Parse Jobdigger PDF report and extract structured data
     
     Args:
         pdf_url_or_path: URL or file path to Jobdigger PDF
+        guarded: Cap text size and extraction time (see run_extractors)
         
     Returns:
-        Structured data extracted from report
+        Structured data extracted from report; 'partial' is True when the
+        text was truncated or extractors were skipped
     """
     try:
         # Download PDF if URL
         if pdf_url_or_path.startswith('http'):
-            response = requests.get(pdf_url_or_path)
+            response = http_get(pdf_url_or_path)
             pdf_file = BytesIO(response.content)
         else:
             pdf_file = open(pdf_url_or_path, 'rb')
@@ -43,32 +57,24 @@ def parse_jobdigger_pdf(pdf_url_or_path: str) -> Dict[str, Any]:
         text = ""
         for page in pdf_reader.pages:
             text += page.extract_text() or ""
+            if guarded and len(text) > MAX_EXTRACT_CHARS:
+                break
         
         # Extract data points
+        extracted, extraction = run_extractors(text, guarded=guarded)
         data = {
             'source': 'Jobdigger Report',
             'parsed_at': datetime.now().isoformat(),
             'confidence': 90,
-            'vacancy_count': extract_vacancy_count(text),
-            'related_titles': extract_related_titles(text),
-            'salary': extract_salary(text),
-            'experience_split': extract_experience(text),
-            'education_levels': extract_education(text),
-            'top_skills': extract_skills(text),
-            'soft_skills': extract_soft_skills(text),
-            'certificates': extract_certificates(text),
-            'languages': extract_languages(text),
-            'employment_type': extract_employment_type(text),
-            'top_employers': extract_employers(text),
-            'top_intermediairs': extract_intermediairs(text),
-            'job_boards': extract_job_boards(text),
-            'time_to_fill': extract_time_to_fill(text)
+            **extracted
         }
         
         return {
             'success': True,
             'data': data,
-            'raw_text_length': len(text)
+            'raw_text_length': len(text),
+            'partial': extraction['partial'],
+            'extraction': extraction
         }
         
     except Exception as e:
@@ -78,10 +84,32 @@ def parse_jobdigger_pdf(pdf_url_or_path: str) -> Dict[str, Any]:
             'data': None
         }
 
+# === REGEX HELPERS ===
+# Thin wrappers so a profiled run can time every pattern (see profiling.py).
+# Patterns are compiled before the clock starts, so the first call of a
+# pattern is not charged for re's compile.
+def _search(pattern: str, text: str, flags: int = 0) -> Optional[re.Match]:
+    if not regex_timing_enabled():
+        return re.search(pattern, text, flags)
+    compiled = re.compile(pattern, flags)
+    started = time.perf_counter()
+    match = compiled.search(text)
+    record_regex(pattern, time.perf_counter() - started)
+    return match
+
+def _findall(pattern: str, text: str, flags: int = 0) -> List[Any]:
+    if not regex_timing_enabled():
+        return re.findall(pattern, text, flags)
+    compiled = re.compile(pattern, flags)
+    started = time.perf_counter()
+    matches = compiled.findall(text)
+    record_regex(pattern, time.perf_counter() - started)
+    return matches
+
 # === EXTRACTION FUNCTIONS ===
 def extract_vacancy_count(text: str) -> Optional[int]:
     """Extract: 'Totaal: 26.735 gepubliceerde vacatures'"""
-    match = re.search(r'Totaal:\s*([\d.]+)\s*gepubliceerde vacatures', text)
+    match = _search(r'Totaal:\s*+(?=\.*\d)([\d.]++)\s*+gepubliceerde vacatures', text)
     if match:
         count_str = match.group(1).replace('.', '')
         return int(count_str)
@@ -91,8 +119,8 @@ def extract_related_titles(text: str) -> List[Dict[str, Any]]:
     """Extract related job titles with counts"""
     titles = []
     # Pattern: "1 5.763 x Monteur"
-    pattern = r'(\d+)\s+([\d.]+)\s*x\s+([A-Za-z\s]+)'
-    matches = re.findall(pattern, text)
+    pattern = r'(?<!\d)(\d++)\s++(?=\.*\d)([\d.]++)\s*+x\s+([A-Za-z\s]+)'
+    matches = _findall(pattern, text)
     
     for rank, count, title in matches[:10]:  # Top 10
         count_clean = count.replace('.', '')
@@ -109,10 +137,12 @@ def extract_salary(text: str) -> Dict[str, Any]:
     salaries = {}
     
     # Pattern: "Junior €30.000 ... Medior €40.000 ... Senior €50.000"
-    junior = re.search(r'Junior.*?€\s*([\d.]+)', text)
-    medior = re.search(r'Medior.*?€\s*([\d.]+)', text)
-    senior = re.search(r'Senior.*?€\s*([\d.]+)', text)
-    gemiddeld = re.search(r'Gemiddeld[:\s]*€\s*([\d.]+)', text)
+    # The amount must follow within 100 characters; an unbounded .*? rescans
+    # the rest of the line for every "Junior" without a euro sign
+    junior = _search(r'Junior.{0,100}?€\s*+(?=\.*\d)([\d.]++)', text)
+    medior = _search(r'Medior.{0,100}?€\s*+(?=\.*\d)([\d.]++)', text)
+    senior = _search(r'Senior.{0,100}?€\s*+(?=\.*\d)([\d.]++)', text)
+    gemiddeld = _search(r'Gemiddeld[:\s]*+€\s*+(?=\.*\d)([\d.]++)', text)
     
     if junior:
         salaries['junior'] = int(junior.group(1).replace('.', ''))
@@ -130,8 +160,8 @@ def extract_experience(text: str) -> Dict[str, int]:
     experience = {}
     
     # Pattern: "junior 41%"
-    pattern = r'(junior|medior|senior)\s+(\d+)%'
-    matches = re.findall(pattern, text, re.IGNORECASE)
+    pattern = r'(junior|medior|senior)\s++(\d++)%'
+    matches = _findall(pattern, text, re.IGNORECASE)
     
     for level, percentage in matches:
         experience[level.lower()] = int(percentage)
@@ -144,8 +174,8 @@ def extract_education(text: str) -> Dict[str, int]:
     
     levels = ['MBO', 'VMBO', 'HBO', 'WO', 'HAVO', 'VWO', 'LBO']
     for level in levels:
-        pattern = rf'{level}\s+(\d+)%'
-        match = re.search(pattern, text)
+        pattern = rf'{level}\s++(\d++)%'
+        match = _search(pattern, text)
         if match:
             education[level] = int(match.group(1))
     
@@ -156,8 +186,10 @@ def extract_skills(text: str) -> List[Dict[str, Any]]:
     skills = []
     
     # Pattern: "Onderhoudswerkzaamheden 52%"
-    pattern = r'([A-Za-z/\s\-]+?)\s+(\d+)%'
-    matches = re.findall(pattern, text)
+    # Matches a whole run of name characters ending in whitespace, starting
+    # only where such a run starts, so each run is scanned once
+    pattern = r'(?<![A-Za-z/\s\-])([A-Za-z/\s\-]++)(?<=\s)(\d++)%'
+    matches = _findall(pattern, text)
     
     seen_skills = set()
     for skill, percentage in matches:
@@ -186,8 +218,8 @@ def extract_soft_skills(text: str) -> List[Dict[str, Any]]:
     
     found = []
     for skill in soft_skills:
-        pattern = rf'{skill}\s+(\d+)%'
-        match = re.search(pattern, text)
+        pattern = rf'{skill}\s++(\d++)%'
+        match = _search(pattern, text)
         if match:
             found.append({
                 'skill': skill,
@@ -208,8 +240,9 @@ def extract_certificates(text: str) -> List[Dict[str, Any]]:
     ]
     
     for cert in cert_patterns:
-        pattern = rf'{cert}.*?(\d+)%'
-        match = re.search(pattern, text)
+        # Percentage must follow within 100 characters
+        pattern = rf'{cert}.{{0,100}}?(?<!\d)(\d++)%'
+        match = _search(pattern, text)
         if match:
             certs.append({
                 'certificate': cert,
@@ -224,8 +257,8 @@ def extract_languages(text: str) -> Dict[str, int]:
     
     lang_list = ['Nederlands', 'Engels', 'Duits', 'Frans']
     for lang in lang_list:
-        pattern = rf'{lang}\s+(\d+)%'
-        match = re.search(pattern, text)
+        pattern = rf'{lang}\s++(\d++)%'
+        match = _search(pattern, text)
         if match:
             languages[lang] = int(match.group(1))
     
@@ -236,8 +269,8 @@ def extract_employment_type(text: str) -> Dict[str, int]:
     types = {}
     
     # Pattern: "vast: 79%"
-    pattern = r'(vast|tijdelijk|stage|zzp|interim)\s*:\s*(\d+)%'
-    matches = re.findall(pattern, text, re.IGNORECASE)
+    pattern = r'(vast|tijdelijk|stage|zzp|interim)\s*+:\s*+(\d++)%'
+    matches = _findall(pattern, text, re.IGNORECASE)
     
     for emp_type, percentage in matches:
         types[emp_type.lower()] = int(percentage)
@@ -249,8 +282,8 @@ def extract_employers(text: str) -> List[Dict[str, Any]]:
     employers = []
     
     # Pattern: "1 254 x Tata Steel"
-    pattern = r'(\d+)\s+([\d.]+)\s*x\s+([A-Za-z\s&\-\.]+?)(?:\n|\s{2,})'
-    matches = re.findall(pattern, text)
+    pattern = r'(?<!\d)(\d++)\s++(?=\.*\d)([\d.]++)\s*+x\s+([A-Za-z\s&\-\.]+?)(?:\n|\s{2,})'
+    matches = _findall(pattern, text)
     
     for rank, count, name in matches[:10]:
         count_clean = count.replace('.', '')
@@ -271,8 +304,8 @@ def extract_job_boards(text: str) -> List[Dict[str, Any]]:
     boards = []
     
     # Pattern: "www.jobbird.com 9%"
-    pattern = r'((?:www\.)?[\w\-\.]+\.(?:nl|com|co))\s+(\d+)%'
-    matches = re.findall(pattern, text)
+    pattern = r'(?<![\w\-\.])((?:www\.)?[\w\-\.]+\.(?:nl|com|co))\s++(\d++)%'
+    matches = _findall(pattern, text)
     
     for board, percentage in matches[:10]:
         boards.append({
@@ -285,14 +318,86 @@ def extract_job_boards(text: str) -> List[Dict[str, Any]]:
 def extract_time_to_fill(text: str) -> Dict[str, Any]:
     """Extract time-to-fill metrics"""
     # Pattern: "Gemiddelde invultijd intermediair 30 dagen"
-    intermediair = re.search(r'intermediair[:\s]+(\d+)\s*dagen', text, re.IGNORECASE)
-    direct = re.search(r'directe werkgever[:\s]+(\d+)\s*dagen', text, re.IGNORECASE)
+    intermediair = _search(r'intermediair[:\s]++(\d++)\s*+dagen', text, re.IGNORECASE)
+    direct = _search(r'directe werkgever[:\s]++(\d++)\s*+dagen', text, re.IGNORECASE)
     
     return {
         'intermediair_days': int(intermediair.group(1)) if intermediair else None,
         'direct_days': int(direct.group(1)) if direct else None
     }
 
+# Field -> (extractor, factory for the value used when it is skipped)
+EXTRACTORS: Dict[str, Tuple[Callable[[str], Any], Callable[[], Any]]] = {
+    'vacancy_count': (extract_vacancy_count, lambda: None),
+    'related_titles': (extract_related_titles, list),
+    'salary': (extract_salary, dict),
+    'experience_split': (extract_experience, dict),
+    'education_levels': (extract_education, dict),
+    'top_skills': (extract_skills, list),
+    'soft_skills': (extract_soft_skills, list),
+    'certificates': (extract_certificates, list),
+    'languages': (extract_languages, dict),
+    'employment_type': (extract_employment_type, dict),
+    'top_employers': (extract_employers, list),
+    'top_intermediairs': (extract_intermediairs, list),
+    'job_boards': (extract_job_boards, list),
+    'time_to_fill': (extract_time_to_fill, lambda: {'intermediair_days': None, 'direct_days': None}),
+}
+
+def run_extractors(text: str, guarded: bool = True) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Run every extractor over the report text
+
+    In guarded mode the text is capped at MAX_EXTRACT_CHARS, an extractor
+    slower than EXTRACTOR_BUDGET_SECONDS marks the result partial (its value
+    is kept, but the parse is not memoized as complete), an extractor that
+    raises gets its empty value, and once EXTRACTION_BUDGET_SECONDS is
+    spent the remaining extractors are skipped and get their empty value.
+    A running re match cannot be interrupted, so budgets are checked
+    between extractors; the patterns themselves are written to run in
+    linear time.
+
+    Returns:
+        (field -> value, extraction report with 'partial' flag and timings)
+    """
+    extraction = {
+        'partial': False,
+        'truncated': False,
+        'skipped': [],
+        'failed': [],
+        'over_budget': [],
+        'timings': {}
+    }
+    if guarded and len(text) > MAX_EXTRACT_CHARS:
+        text = text[:MAX_EXTRACT_CHARS]
+        extraction['truncated'] = extraction['partial'] = True
+
+    results = {}
+    started = time.perf_counter()
+    for field, (extractor, empty) in EXTRACTORS.items():
+        if guarded and time.perf_counter() - started > EXTRACTION_BUDGET_SECONDS:
+            results[field] = empty()
+            extraction['skipped'].append(field)
+            extraction['partial'] = True
+            continue
+        extractor_started = time.perf_counter()
+        try:
+            with extractor_scope(field):
+                results[field] = extractor(text)
+        except Exception:
+            if not guarded:
+                raise
+            results[field] = empty()
+            extraction['failed'].append(field)
+            extraction['partial'] = True
+        elapsed = time.perf_counter() - extractor_started
+        extraction['timings'][field] = round(elapsed, 4)
+        if guarded and elapsed > EXTRACTOR_BUDGET_SECONDS:
+            extraction['over_budget'].append(field)
+            extraction['partial'] = True
+
+    return results, extraction
+
 # === MCP TOOL 2: SCRAPE INDEED VIA BRAVE ===
 def scrape_indeed_market_data(
     job_title: str,
@@ -314,8 +419,8 @@ def scrape_indeed_market_data(
         # Search Indeed via Brave
         query = f'site:nl.indeed.com "{job_title}" "{location}"'
         
-        response = requests.get(
-            'https://api.search.brave.com/res/v1/web/search',
+        response = http_get(
+            BRAVE_SEARCH_URL,
             params={'q': query, 'count': min(max_results, 20)},
             headers={
                 'Accept': 'application/json',
@@ -380,7 +485,7 @@ def extract_employer_from_snippet(snippet: str) -> Optional[str]:
     ]
     
     for pattern in patterns:
-        match = re.search(pattern, snippet, re.IGNORECASE)
+        match = _search(pattern, snippet, re.IGNORECASE)
         if match:
             return match.group(1).strip()
     
@@ -389,7 +494,7 @@ def extract_employer_from_snippet(snippet: str) -> Optional[str]:
 def extract_salary_from_snippet(snippet: str) -> Optional[int]:
     """Extract salary from snippet"""
     # Pattern: "€3.000 - €4.000", "€40.000 per jaar"
-    match = re.search(r'€\s*([\d.]+)', snippet)
+    match = _search(r'€\s*([\d.]+)', snippet)
     if match:
         salary_str = match.group(1).replace('.', '')
         return int(salary_str)
@@ -404,6 +509,142 @@ def extract_employers_from_vacancies(vacancies: List[Dict]) -> List[str]:
     
     return sorted(employers.items(), key=lambda x: x[1], reverse=True)
 
+# === DEEP DIVE MEMOIZATION ===
+# Every source result and every synthesized field is a node keyed by its
+# inputs. Fields are keyed by the content of the source results they use, so
+# when one source changes (or is fetched again) only its fields are redone.
+# Values are copied in and out of the cache, so callers may mutate them.
+_deepdive_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_deepdive_cache_lock = threading.Lock()
+
+def _node_key(kind: str, *inputs: Any) -> str:
+    """Stable hash of a node kind and its inputs"""
+    payload = json.dumps([kind, *inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _pdf_fingerprint(pdf_url_or_path: str) -> List[Any]:
+    """Identify a PDF input: URLs by address, local files by size and mtime"""
+    if pdf_url_or_path.startswith('http'):
+        return [pdf_url_or_path]
+    try:
+        stat = os.stat(pdf_url_or_path)
+    except OSError:
+        return [pdf_url_or_path]
+    return [os.path.abspath(pdf_url_or_path), stat.st_size, stat.st_mtime_ns]
+
+def _cache_get(key: str) -> Tuple[bool, Any]:
+    """Return (hit, value) for a node, dropping it once it is past the TTL"""
+    with _deepdive_cache_lock:
+        entry = _deepdive_cache.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if time.time() - stored_at > DEEPDIVE_CACHE_TTL:
+            del _deepdive_cache[key]
+            return False, None
+        _deepdive_cache.move_to_end(key)
+    return True, copy.deepcopy(value)
+
+def _cache_put(key: str, value: Any) -> None:
+    value = copy.deepcopy(value)
+    with _deepdive_cache_lock:
+        _deepdive_cache[key] = (time.time(), value)
+        _deepdive_cache.move_to_end(key)
+        while len(_deepdive_cache) > DEEPDIVE_CACHE_SIZE:
+            _deepdive_cache.popitem(last=False)
+
+def _memoized(
+    key: str,
+    compute: Callable[[], Any],
+    use_cache: bool = True,
+    cacheable: Callable[[Any], bool] = lambda value: True
+) -> Tuple[Any, bool]:
+    """Return (value, cache_hit) for a node, computing it on a miss"""
+    if use_cache:
+        hit, value = _cache_get(key)
+        if hit:
+            return value, True
+    value = compute()
+    if cacheable(value):
+        _cache_put(key, value)
+    return value, False
+
+def _jobdigger_key(pdf_url_or_path: str) -> str:
+    return _node_key('jobdigger', *_pdf_fingerprint(pdf_url_or_path))
+
+def get_cached_jobdigger(pdf_url_or_path: str) -> Optional[Dict[str, Any]]:
+    """Memoized parse_jobdigger_pdf result for this PDF, if any"""
+    hit, result = _cache_get(_jobdigger_key(pdf_url_or_path))
+    return result if hit else None
+
+def put_cached_jobdigger(pdf_url_or_path: str, result: Dict[str, Any]) -> None:
+    """Seed the cache with a parse done elsewhere (e.g. in a worker process)"""
+    if result.get('success') and not result.get('partial'):
+        _cache_put(_jobdigger_key(pdf_url_or_path), result)
+
+def clear_deepdive_cache() -> None:
+    """Drop all memoized source results and synthesized fields"""
+    with _deepdive_cache_lock:
+        _deepdive_cache.clear()
+
+# Synthesized field -> (sources it depends on, how to compute it)
+SYNTHESIS_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {
+    'vacancy_count': (('jobdigger', 'indeed'), lambda s: (
+        s['jobdigger']['vacancy_count'] if s['jobdigger'] else
+        s['indeed'].get('total_found')
+    )),
+    'salary': (('jobdigger', 'indeed'), lambda s: (
+        s['jobdigger']['salary'] if s['jobdigger'] else
+        {'median': s['indeed'].get('avg_salary')}
+    )),
+    'top_skills': (('jobdigger',), lambda s: (
+        s['jobdigger']['top_skills'] if s['jobdigger'] else []
+    )),
+    'experience_split': (('jobdigger',), lambda s: (
+        s['jobdigger']['experience_split'] if s['jobdigger'] else {}
+    )),
+    'education_levels': (('jobdigger',), lambda s: (
+        s['jobdigger']['education_levels'] if s['jobdigger'] else {}
+    )),
+    'employment_type': (('jobdigger',), lambda s: (
+        s['jobdigger']['employment_type'] if s['jobdigger'] else {}
+    )),
+    'top_employers': (('jobdigger', 'indeed'), lambda s: (
+        s['jobdigger']['top_employers'] if s['jobdigger'] else
+        [{'name': e[0], 'count': e[1]} for e in s['indeed'].get('employers', [])]
+    )),
+    'job_boards': (('jobdigger',), lambda s: (
+        s['jobdigger']['job_boards'] if s['jobdigger'] else []
+    )),
+    'time_to_fill': (('jobdigger',), lambda s: (
+        s['jobdigger']['time_to_fill'] if s['jobdigger'] else {}
+    )),
+}
+
+def synthesize_insights(
+    sources: Dict[str, Any],
+    versions: Dict[str, Optional[str]],
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Build synthesized_insights from the source results
+
+    Args:
+        sources: Source name -> result (None when unavailable)
+        versions: Source name -> content hash of that result (None when unavailable)
+        use_cache: Reuse memoized fields whose source versions are unchanged
+
+    Returns:
+        Synthesized field -> value
+    """
+    synthesized = {}
+    for field, (deps, compute) in SYNTHESIS_FIELDS.items():
+        key = _node_key('field', field, [versions.get(dep) for dep in deps])
+        synthesized[field], _ = _memoized(
+            key, lambda: compute(sources), use_cache=use_cache
+        )
+    return synthesized
+
 # === MCP TOOL 3: LABOUR MARKET DEEP DIVE ===
 def labour_market_deepdive(
     job_title: str,
@@ -411,7 +652,9 @@ def labour_market_deepdive(
     jobdigger_pdf_path: Optional[str] = None,
     linkedin_ti_pdf_path: Optional[str] = None,
     vacancy_text: Optional[str] = None,
-    vacancy_url: Optional[str] = None
+    vacancy_url: Optional[str] = None,
+    use_cache: bool = True,
+    jobdigger_result: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Complete labour market deep dive analysis
@@ -423,6 +666,9 @@ def labour_market_deepdive(
         linkedin_ti_pdf_path: Path to LinkedIn TI PDF (optional)
         vacancy_text: Vacancy text for analysis (optional)
         vacancy_url: Vacancy URL (optional)
+        use_cache: Reuse memoized source results and fields (default True)
+        jobdigger_result: parse_jobdigger_pdf output parsed elsewhere, used
+            instead of downloading and parsing jobdigger_pdf_path (optional)
         
     Returns:
         Complete market intelligence report
@@ -431,48 +677,58 @@ def labour_market_deepdive(
     
     # Collect data from all sources
     data_sources = []
+    # Content hash per successful source, so unchanged results keep their
+    # fields and a re-fetched source never reuses fields of an older fetch
+    versions: Dict[str, Optional[str]] = {'jobdigger': None, 'indeed': None}
     
     # 1. Parse Jobdigger if provided
     jobdigger_data = None
-    if jobdigger_pdf_path:
-        print("📄 Parsing Jobdigger report...")
-        result = parse_jobdigger_pdf(jobdigger_pdf_path)
-        if result['success']:
-            jobdigger_data = result['data']
-            data_sources.append('Jobdigger Report')
+    result = None
+    if jobdigger_result is not None:
+        # Parsed upstream (e.g. in a pipeline worker process)
+        result = jobdigger_result
+        print("📄 Using Jobdigger report parsed upstream")
+    elif jobdigger_pdf_path:
+        result, hit = _memoized(
+            _jobdigger_key(jobdigger_pdf_path),
+            lambda: parse_jobdigger_pdf(jobdigger_pdf_path),
+            use_cache=use_cache,
+            cacheable=lambda r: r['success'] and not r.get('partial')
+        )
+        print("📄 Jobdigger report unchanged, using cached result" if hit
+              else "📄 Parsing Jobdigger report...")
+    if result and result['success']:
+        jobdigger_data = result['data']
+        data_sources.append('Jobdigger Report')
+        versions['jobdigger'] = _node_key('jobdigger-result', jobdigger_data)
     
     # 2. Scrape Indeed
-    print("🔎 Scraping Indeed via Brave Search...")
-    indeed_data = scrape_indeed_market_data(job_title, location, max_results=50)
+    indeed_data, hit = _memoized(
+        _node_key('indeed', job_title, location, 50),
+        lambda: scrape_indeed_market_data(job_title, location, max_results=50),
+        use_cache=use_cache,
+        cacheable=lambda r: r['success']
+    )
+    print("🔎 Indeed results cached, skipping Brave Search" if hit
+          else "🔎 Scraping Indeed via Brave Search...")
     if indeed_data['success']:
         data_sources.append('Indeed (Brave Search)')
+        versions['indeed'] = _node_key('indeed-result', indeed_data)
     
     # 3. TODO: Parse LinkedIn TI if provided
     # 4. TODO: Fetch CBS employment data
     # 5. TODO: Scrape UWV vacancy stats
+    # New sources get a content hash in `versions` and are listed as dependencies
+    # in SYNTHESIS_FIELDS for the fields they feed.
     
     # Synthesize all data
     print("🧠 Synthesizing data from all sources...")
     
-    synthesized = {
-        'vacancy_count': (
-            jobdigger_data['vacancy_count'] if jobdigger_data else
-            indeed_data.get('total_found')
-        ),
-        'salary': jobdigger_data['salary'] if jobdigger_data else {
-            'median': indeed_data.get('avg_salary')
-        },
-        'top_skills': jobdigger_data['top_skills'] if jobdigger_data else [],
-        'experience_split': jobdigger_data['experience_split'] if jobdigger_data else {},
-        'education_levels': jobdigger_data['education_levels'] if jobdigger_data else {},
-        'employment_type': jobdigger_data['employment_type'] if jobdigger_data else {},
-        'top_employers': (
-            jobdigger_data['top_employers'] if jobdigger_data else
-            [{'name': e[0], 'count': e[1]} for e in indeed_data.get('employers', [])]
-        ),
-        'job_boards': jobdigger_data['job_boards'] if jobdigger_data else [],
-        'time_to_fill': jobdigger_data['time_to_fill'] if jobdigger_data else {}
-    }
+    synthesized = synthesize_insights(
+        {'jobdigger': jobdigger_data, 'indeed': indeed_data},
+        versions,
+        use_cache=use_cache
+    )
     
     # Calculate confidence
     confidence = 0
@@ -519,7 +775,7 @@ def generate_notion_report(
         report_type: executive | standard | extensive | action_plan
         
     Returns:
-        Markdown formatted report for Notion
+        Markdown formatted report for Notion, with an ETag of the markdown
     """
     meta = research_data['metadata']
     synth = research_data['synthesized_insights']
@@ -539,7 +795,7 @@ def generate_notion_report(
 
 ### Key Metrics
 - **Total Vacatures:** {synth.get('vacancy_count') or 'N/A'}
-- **Mediaan Salaris:** €{synth['salary'].get('median', 'N/A'):,} per jaar
+- **Mediaan Salaris:** €{format_salary(synth.get('salary', {}).get('median'))} per jaar
 - **Top Skills:** {len(synth.get('top_skills', []))} identified
 - **Time-to-Fill:** {synth.get('time_to_fill', {}).get('intermediair_days', 'N/A')} days (avg)
 
@@ -621,7 +877,8 @@ def generate_notion_report(
         'success': True,
         'report_type': report_type,
         'markdown': report,
-        'word_count': len(report.split())
+        'word_count': len(report.split()),
+        'etag': hashlib.sha256(report.encode('utf-8')).hexdigest()
     }
 
 # === MAIN FUNCTION FOR TESTING ===
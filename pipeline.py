@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Staged webhook-to-report pipeline
+Each stage has its own bounded queue and worker pool; a full queue pushes
+back on the stage before it, and on the webhook when the first one fills up
+"""
+
+import importlib.util
+import logging
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+from transport import http_get
+from profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+# === CONFIGURATION ===
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))  # per stage
+PIPELINE_IO_WORKERS = int(os.getenv("PIPELINE_IO_WORKERS", "4"))  # threads
+PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", "2"))  # processes
+PIPELINE_BACKPRESSURE = os.getenv("PIPELINE_BACKPRESSURE", "reject")  # reject | block
+PIPELINE_SUBMIT_TIMEOUT = float(os.getenv("PIPELINE_SUBMIT_TIMEOUT", "5"))  # seconds, block mode
+PIPELINE_MAX_RESULTS = int(os.getenv("PIPELINE_MAX_RESULTS", "256"))
+
+MCP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'labour-market-intelligence-mcp.py')
+
+_STOP = object()
+
+class PipelineFull(Exception):
+    """The first stage queue is full and the job was not accepted"""
+
+# === MCP MODULE ===
+_mcp = None
+_mcp_lock = threading.Lock()
+
+def load_mcp():
+    """Import labour-market-intelligence-mcp.py (not importable by name)"""
+    global _mcp
+    with _mcp_lock:
+        if _mcp is None:
+            spec = importlib.util.spec_from_file_location('labour_market_intelligence_mcp', MCP_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _mcp = module
+        return _mcp
+
+# === STAGE ===
+class Stage:
+    """
+    Bounded queue plus a pool of workers running `func(job) -> job`
+
+    Thread stages run `func` on the worker threads. Process stages use one
+    thread per worker process to hand jobs to a ProcessPoolExecutor, so
+    `func` and the job must be picklable.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Dict[str, Any]], Dict[str, Any]],
+        workers: int = 1,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        executor: str = 'thread'
+    ):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.executor = executor
+        self.next: Optional['Stage'] = None
+        self.on_done: Callable[[Dict[str, Any]], None] = lambda job: None
+        self.on_error: Callable[[Dict[str, Any], Exception], None] = lambda job, e: None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._processed = 0
+        self._failed = 0
+        self._in_flight = 0
+        self._busy_seconds = 0.0
+
+    def start(self) -> None:
+        if self.executor == 'process':
+            self._pool = self._new_pool()
+        self._started_at = time.time()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def _run_in_pool(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        pool = self._pool
+        try:
+            return pool.submit(self.func, job).result()
+        except BrokenProcessPool:
+            # A crashed child (e.g. OOM on a huge PDF) breaks the whole pool;
+            # replace it so later jobs still get parsed
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+            raise
+
+    def put(self, job: Dict[str, Any], block: bool = True, timeout: Optional[float] = None) -> None:
+        """Enqueue a job; raises queue.Full when not accepted in time"""
+        self._queue.put(job, block=block, timeout=timeout)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            with self._lock:
+                self._in_flight += 1
+            started = time.perf_counter()
+            try:
+                if self._pool:
+                    job = self._run_in_pool(job)
+                else:
+                    job = self.func(job)
+            except Exception as e:
+                logger.error(f"Stage {self.name} failed for job {job.get('job_id')}: {e}", exc_info=True)
+                self._record(started, failed=True)
+                self.on_error(job, e)
+                continue
+            self._record(started)
+            if self.next:
+                # Blocks while the next stage is full, so backpressure
+                # travels upstream instead of piling up in memory
+                self.next.put(job)
+            else:
+                self.on_done(job)
+
+    def _record(self, started: float, failed: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._busy_seconds += time.perf_counter() - started
+            if failed:
+                self._failed += 1
+            else:
+                self._processed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            uptime = max(time.time() - self._started_at, 1e-9)
+            finished = self._processed + self._failed
+            return {
+                'executor': self.executor,
+                'workers': self.workers,
+                'queued': self._queue.qsize(),
+                'capacity': self._queue.maxsize,
+                'in_flight': self._in_flight,
+                'processed': self._processed,
+                'failed': self._failed,
+                'throughput_per_min': round(self._processed / uptime * 60, 2),
+                'avg_seconds': round(self._busy_seconds / finished, 3) if finished else None
+            }
+
+# === PIPELINE ===
+class Pipeline:
+    """Chain of stages with job status tracking"""
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        backpressure: str = PIPELINE_BACKPRESSURE,
+        submit_timeout: float = PIPELINE_SUBMIT_TIMEOUT,
+        max_results: int = PIPELINE_MAX_RESULTS
+    ):
+        self.stages = stages
+        self.backpressure = backpressure
+        self.submit_timeout = submit_timeout
+        self.max_results = max_results
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next = next_stage
+        for stage in stages:
+            stage.on_error = self._job_failed
+        stages[-1].on_done = self._job_done
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+
+    def shutdown(self) -> None:
+        for stage in self.stages:
+            stage.stop()
+
+    def submit(self, job: Dict[str, Any]) -> None:
+        """
+        Queue a job at the first stage
+
+        Raises:
+            PipelineFull: queue full (reject mode) or still full after
+                submit_timeout seconds (block mode)
+        """
+        self._set_status(job['job_id'], {'status': 'queued', 'submitted_at': time.time()})
+        try:
+            if self.backpressure == 'block':
+                self.stages[0].put(job, block=True, timeout=self.submit_timeout)
+            else:
+                self.stages[0].put(job, block=False)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+                self._jobs.pop(job['job_id'], None)
+            raise PipelineFull(f"Pipeline stage '{self.stages[0].name}' is full")
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rejected = self._rejected
+        return {
+            'backpressure': self.backpressure,
+            'rejected': rejected,
+            'stages': {stage.name: stage.stats() for stage in self.stages}
+        }
+
+    def _set_status(self, job_id: str, status: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job_id] = status
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_results:
+                self._jobs.popitem(last=False)
+
+    def _job_done(self, job: Dict[str, Any]) -> None:
+        _cleanup(job)
+        self._set_status(job['job_id'], {
+            'status': 'completed',
+            'finished_at': time.time(),
+            'report': job.get('report')
+        })
+
+    def _job_failed(self, job: Dict[str, Any], error: Exception) -> None:
+        _cleanup(job)
+        self._set_status(job['job_id'], {
+            'status': 'failed',
+            'finished_at': time.time(),
+            'error': str(error)
+        })
+
+# === STAGE FUNCTIONS ===
+def download_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Network I/O: fetch the Jobdigger PDF to a temp file"""
+    url = job.get('jobdigger_pdf_url')
+    if not url:
+        return job
+
+    cached = load_mcp().get_cached_jobdigger(url)
+    if cached:
+        job['jobdigger_result'] = cached
+        return job
+
+    response = http_get(url)
+    if response.status_code != 200:
+        job['jobdigger_result'] = {
+            'success': False,
+            'error': f'PDF download error: {response.status_code}',
+            'data': None
+        }
+        return job
+
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+        f.write(response.content)
+        job['jobdigger_pdf_path'] = f.name
+    return job
+
+def parse_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """CPU: parse the downloaded PDF (runs in a worker process)"""
+    if job.get('jobdigger_pdf_path') and 'jobdigger_result' not in job:
+        mcp = load_mcp()
+        with _maybe_profiled(job, 'parse'):
+            job['jobdigger_result'] = mcp.parse_jobdigger_pdf(job['jobdigger_pdf_path'])
+    return job
+
+def analyse_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Network I/O: deep dive on the parse from the previous stage"""
+    mcp = load_mcp()
+    url = job.get('jobdigger_pdf_url')
+    parsed = job.get('jobdigger_result')
+    if url and parsed:
+        # Lets the download stage skip repeat URLs (partial parses are not kept)
+        mcp.put_cached_jobdigger(url, parsed)
+
+    with _maybe_profiled(job, 'deepdive'):
+        job['research'] = mcp.labour_market_deepdive(
+            job_title=job['job_title'],
+            location=job['location'],
+            jobdigger_result=parsed
+        )
+    return job
+
+def report_stage(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Render the Notion report"""
+    job['report'] = load_mcp().generate_notion_report(
+        job['research'],
+        report_type=job.get('report_type') or 'standard'
+    )
+    # TODO: Send email
+    return job
+
+def _maybe_profiled(job: Dict[str, Any], stage: str):
+    """Profile the stage when the job asked for it (env var or request header)"""
+    return profiled(job['job_id'], stage) if job.get('profile') else nullcontext()
+
+def _cleanup(job: Dict[str, Any]) -> None:
+    path = job.get('jobdigger_pdf_path')
+    if path:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def build_pipeline() -> Pipeline:
+    return Pipeline([
+        Stage('download', download_stage, workers=PIPELINE_IO_WORKERS),
+        Stage('parse', parse_stage, workers=PIPELINE_PARSE_WORKERS, executor='process'),
+        Stage('analyse', analyse_stage, workers=PIPELINE_IO_WORKERS),
+        Stage('report', report_stage, workers=1),
+    ])
+
+_pipeline: Optional[Pipeline] = None
+_pipeline_lock = threading.Lock()
+
+def get_pipeline() -> Pipeline:
+    """Process-wide pipeline, started on first use"""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = build_pipeline()
+            _pipeline.start()
+        return _pipeline
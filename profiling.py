@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for deep-dive runs
+Saves cProfile stats and per-regex match timings per job ID and stage
+"""
+
+import cProfile
+import hmac
+import json
+import logging
+import os
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# === CONFIGURATION ===
+PROFILE_DEEPDIVE = os.getenv("PROFILE_DEEPDIVE", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")  # X-Profile header is ignored while unset
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))  # oldest are deleted beyond this
+
+# Regex timings of the profile running in this thread / task, if any
+_regex_timings: ContextVar[Optional[Dict[Tuple[Optional[str], str], Dict[str, Any]]]] = ContextVar('regex_timings', default=None)
+# EXTRACTORS field currently running (set by run_extractors)
+_current_extractor: ContextVar[Optional[str]] = ContextVar('current_extractor', default=None)
+
+# === REGEX TIMINGS ===
+def regex_timing_enabled() -> bool:
+    return _regex_timings.get() is not None
+
+@contextmanager
+def extractor_scope(field: str) -> Iterator[None]:
+    """Credit regex timings inside the block to this extractor field"""
+    token = _current_extractor.set(field)
+    try:
+        yield
+    finally:
+        _current_extractor.reset(token)
+
+def record_regex(pattern: str, seconds: float) -> None:
+    """Add one match attempt to the active profile (called by the extractors)"""
+    timings = _regex_timings.get()
+    if timings is None:
+        return
+    key = (_current_extractor.get(), pattern)
+    entry = timings.get(key)
+    if entry is None:
+        entry = timings[key] = {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0}
+    entry['calls'] += 1
+    entry['total_seconds'] += seconds
+    entry['max_seconds'] = max(entry['max_seconds'], seconds)
+
+# === PROFILES ===
+PROFILE_SUFFIXES = ('.pstats', '.regex.json')
+
+def profile_header_allowed(value: str) -> bool:
+    """True when an X-Profile header value matches PROFILE_TOKEN"""
+    if not PROFILE_TOKEN or not value:
+        return False
+    return hmac.compare_digest(value.encode('utf-8'), PROFILE_TOKEN.encode('utf-8'))
+
+def _profile_path(job_id: str, stage: str, suffix: str) -> str:
+    safe_id = re.sub(r'[^\w.-]', '_', str(job_id))
+    return os.path.join(PROFILE_DIR, f"{safe_id}.{stage}.{suffix}")
+
+def _mtime(entry: os.DirEntry) -> float:
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return 0.0
+
+def _prune_profiles() -> None:
+    """Delete the oldest profile files beyond PROFILE_MAX_FILES"""
+    try:
+        entries = [e for e in os.scandir(PROFILE_DIR) if e.name.endswith(PROFILE_SUFFIXES)]
+    except OSError:
+        return
+    excess = len(entries) - PROFILE_MAX_FILES
+    if excess <= 0:
+        return
+    for entry in sorted(entries, key=_mtime)[:excess]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            # Already removed by another worker
+            pass
+
+@contextmanager
+def profiled(job_id: str, stage: str) -> Iterator[None]:
+    """
+    Run the block under cProfile with regex timing enabled
+
+    Writes <PROFILE_DIR>/<job_id>.<stage>.pstats (open with `python -m pstats`
+    or snakeviz) and <job_id>.<stage>.regex.json, slowest pattern first, then
+    prunes PROFILE_DIR to PROFILE_MAX_FILES. Regex timings are taken while
+    cProfile runs, so they include its call overhead; compare them with each
+    other rather than with unprofiled runs.
+    """
+    timings: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+    token = _regex_timings.set(timings)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _regex_timings.reset(token)
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stats_path = _profile_path(job_id, stage, 'pstats')
+        profiler.dump_stats(stats_path)
+
+        regex_path = _profile_path(job_id, stage, 'regex.json')
+        slowest = sorted(
+            ({'extractor': extractor, 'pattern': pattern, **entry}
+             for (extractor, pattern), entry in timings.items()),
+            key=lambda x: x['total_seconds'],
+            reverse=True
+        )
+        with open(regex_path, 'w') as f:
+            json.dump(slowest, f, indent=2)
+        _prune_profiles()
+
+        logger.info(f"Profile for job {job_id} ({stage}) saved to {stats_path}")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Local stub server for Brave, Jotform and Notion
+Serves fixtures recorded with HTTP_MODE=record, with configurable latency
+and error injection, and replays recorded Jotform submissions to a webhook
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from transport import fixture_key, iter_jotform_submissions, load_fixture
+
+# === CONFIGURATION ===
+STUB_PORT = int(os.getenv("STUB_PORT", "8765"))
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "0"))
+STUB_JITTER_MS = float(os.getenv("STUB_JITTER_MS", "0"))
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))  # 0.0 - 1.0
+STUB_ERROR_STATUS = int(os.getenv("STUB_ERROR_STATUS", "503"))
+
+# === STUB SERVER ===
+class StubHandler(BaseHTTPRequestHandler):
+    """Answer any GET/POST from the fixture recorded for the same request"""
+
+    latency_ms = STUB_LATENCY_MS
+    jitter_ms = STUB_JITTER_MS
+    error_rate = STUB_ERROR_RATE
+    error_status = STUB_ERROR_STATUS
+
+    def do_GET(self):
+        self._serve('GET', None)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            json_body = json.loads(raw) if raw else None
+        except json.JSONDecodeError:
+            json_body = raw.decode('utf-8', errors='replace')
+        self._serve('POST', json_body)
+
+    def _serve(self, method, json_body):
+        delay_ms = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+        if random.random() < self.error_rate:
+            self._send(self.error_status, 'application/json',
+                       json.dumps({'error': 'Injected stub error'}).encode())
+            return
+
+        fixture = load_fixture(fixture_key(method, self.path, json_body=json_body))
+        if fixture is None:
+            self._send(404, 'application/json',
+                       json.dumps({'error': f'No fixture for {method} {self.path}'}).encode())
+            return
+
+        self._send(fixture.status_code,
+                   fixture.headers.get('Content-Type') or 'application/octet-stream',
+                   fixture.content)
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port: int = STUB_PORT) -> None:
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    print(f"🧪 Stub server on http://127.0.0.1:{port} "
+          f"(latency {StubHandler.latency_ms}ms +{StubHandler.jitter_ms}ms, "
+          f"error rate {StubHandler.error_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# === JOTFORM REPLAY ===
+def _post_submission(webhook_url: str, raw_request: str):
+    body = urllib.parse.urlencode({'rawRequest': raw_request}).encode()
+    req = urllib.request.Request(webhook_url, data=body, method='POST')
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+def replay_jotform(webhook_url: str, concurrency: int = 1) -> None:
+    """POST every recorded Jotform submission to the webhook and time it"""
+    payloads = list(iter_jotform_submissions())
+    if not payloads:
+        print("No recorded Jotform submissions found")
+        return
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda p: _post_submission(webhook_url, p), payloads))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for _, t in results)
+    ok = sum(1 for status, _ in results if 200 <= status < 300)
+    print(f"Replayed {len(results)} submissions in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.1f}/s), {ok} OK")
+    print(f"   p50 {latencies[len(latencies) // 2] * 1000:.0f}ms, "
+          f"max {latencies[-1] * 1000:.0f}ms")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=STUB_PORT)
+    parser.add_argument('--latency-ms', type=float, default=STUB_LATENCY_MS)
+    parser.add_argument('--jitter-ms', type=float, default=STUB_JITTER_MS)
+    parser.add_argument('--error-rate', type=float, default=STUB_ERROR_RATE)
+    parser.add_argument('--error-status', type=int, default=STUB_ERROR_STATUS)
+    parser.add_argument('--replay-jotform', metavar='WEBHOOK_URL',
+                        help='POST recorded submissions to this webhook instead of serving')
+    parser.add_argument('--concurrency', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.replay_jotform:
+        replay_jotform(args.replay_jotform, args.concurrency)
+    else:
+        StubHandler.latency_ms = args.latency_ms
+        StubHandler.jitter_ms = args.jitter_ms
+        StubHandler.error_rate = args.error_rate
+        StubHandler.error_status = args.error_status
+        serve(args.port)
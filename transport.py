@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTTP transport for Brave, Jotform and Notion calls
+Live, record and replay modes so the pipeline can run without network access
+"""
+
+import base64
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlsplit
+import requests
+
+# === CONFIGURATION ===
+HTTP_MODE = os.getenv("HTTP_MODE", "live")  # live | record | replay
+FIXTURES_DIR = os.getenv("FIXTURES_DIR", "fixtures")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))  # seconds
+
+# === FIXTURES ===
+class FixtureResponse:
+    """Recorded response with the parts of requests.Response we use"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+def fixture_key(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    json_body: Any = None
+) -> str:
+    """
+    Key a request by method, path, query and body
+
+    Host and headers are left out, so a fixture recorded against the real
+    API also matches the same request sent to the stub server, and API keys
+    never end up on disk.
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query) + [(k, str(v)) for k, v in (params or {}).items()]
+    payload = json.dumps(
+        [method.upper(), parts.path, sorted(query), json_body],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _fixture_path(kind: str, name: str) -> str:
+    return os.path.join(FIXTURES_DIR, kind, f"{name}.json")
+
+def save_fixture(key: str, method: str, url: str, response: Any) -> None:
+    """Write a response to FIXTURES_DIR/http/<key>.json"""
+    path = _fixture_path('http', key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({
+            'method': method.upper(),
+            'url': urlsplit(url)._replace(query='').geturl(),
+            'status_code': response.status_code,
+            'content_type': response.headers.get('Content-Type', ''),
+            'body_b64': base64.b64encode(response.content).decode('ascii')
+        }, f, indent=2)
+
+def load_fixture(key: str) -> Optional[FixtureResponse]:
+    """Read FIXTURES_DIR/http/<key>.json, or None if it was never recorded"""
+    path = _fixture_path('http', key)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        fixture = json.load(f)
+    return FixtureResponse(
+        fixture['status_code'],
+        base64.b64decode(fixture['body_b64']),
+        {'Content-Type': fixture.get('content_type', '')}
+    )
+
+# === TRANSPORTS ===
+def live_transport(method, url, params=None, headers=None, json_body=None):
+    return requests.request(
+        method, url, params=params, headers=headers, json=json_body,
+        timeout=HTTP_TIMEOUT
+    )
+
+def record_transport(method, url, params=None, headers=None, json_body=None):
+    response = live_transport(method, url, params, headers, json_body)
+    save_fixture(fixture_key(method, url, params, json_body), method, url, response)
+    return response
+
+def replay_transport(method, url, params=None, headers=None, json_body=None):
+    response = load_fixture(fixture_key(method, url, params, json_body))
+    if response is None:
+        raise LookupError(f"No recorded fixture for {method.upper()} {url}")
+    return response
+
+TRANSPORTS: Dict[str, Callable[..., Any]] = {
+    'live': live_transport,
+    'record': record_transport,
+    'replay': replay_transport,
+}
+
+_transport = TRANSPORTS[HTTP_MODE]
+
+def set_transport(transport: Any) -> None:
+    """Switch transport by mode name ('live', 'record', 'replay') or callable"""
+    global _transport
+    _transport = TRANSPORTS[transport] if isinstance(transport, str) else transport
+
+def http_request(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    json_body: Any = None
+) -> Any:
+    """Send a request through the active transport"""
+    return _transport(method, url, params=params, headers=headers, json_body=json_body)
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Any:
+    return http_request('GET', url, params=params, headers=headers)
+
+# === JOTFORM SUBMISSIONS ===
+def record_jotform_submission(submission_id: str, raw_request: str) -> None:
+    """Keep a Jotform rawRequest payload as a fixture (record mode only)"""
+    if HTTP_MODE != 'record' or not submission_id:
+        return
+    path = _fixture_path('jotform', os.path.basename(str(submission_id)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(raw_request)
+
+def iter_jotform_submissions() -> Iterator[str]:
+    """Yield recorded rawRequest payloads in a stable order"""
+    directory = os.path.join(FIXTURES_DIR, 'jotform')
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as f:
+                yield f.read()